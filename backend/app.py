@@ -1,14 +1,25 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Callable
 from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import hashlib
+import threading
+import orjson
 import uvicorn
+from anyio import to_thread
 
 from .services.storage import ensure_dirs, save_json, read_json, clear_json_files
-from .services.normalizer import normalize_station_centric, normalize_asset_centric
+from .services.normalizer import (normalize_station_centric, normalize_asset_centric,
+                                  intern_asset_types, warm_worker)
 from .services.comparator import compare_inventories
 from .services.report import build_missing_stations_rows, rows_to_excel_bytes
 from .models import Inventory
@@ -22,7 +33,96 @@ FRONTEND_DIR = ROOT / "frontend"
 # In-memory session state: compare only works when both set in THIS run.
 CURRENT = {"asset_inventory": None, "hydex": None}
 
+# Threads for sync endpoints / run_in_threadpool (AnyIO's default is 40). A single-user
+# app never has that many requests in flight; heavy parsing goes to _POOL instead.
+_THREADPOOL_SIZE = 8
+
+# Worker processes for Excel parsing (CPU-bound; sidesteps the GIL). Created on startup.
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 2
+
+def _new_pool() -> ProcessPoolExecutor:
+    """Start the parse pool and import pandas/parsers in every worker right away, so the
+    first upload doesn't pay process spawn + imports (seconds on Windows, where it's spawn)."""
+    pool = ProcessPoolExecutor(max_workers=_POOL_WORKERS)
+    for _ in range(_POOL_WORKERS):
+        pool.submit(warm_worker)
+    return pool
+
+def _replace_broken_pool(broken: ProcessPoolExecutor) -> None:
+    global _POOL
+    if _POOL is broken:  # another upload may already have replaced it
+        broken.shutdown(wait=False, cancel_futures=True)
+        _POOL = _new_pool()
+
+# Parsed inventories keyed by (source, content hash) so re-uploading the same
+# workbook skips Excel parsing entirely. Small and FIFO-evicted.
+_PARSE_CACHE: "OrderedDict[tuple, Inventory]" = OrderedDict()
+_PARSE_CACHE_MAX = 8
+
+async def _normalize_cached(source: str, content: bytes, normalize: Callable[[bytes], Inventory]) -> Inventory:
+    key = (source, hashlib.blake2b(content, digest_size=16).hexdigest())
+    inventory = _PARSE_CACHE.get(key)
+    if inventory is None:
+        # pandas parsing is blocking; keep it off the event loop
+        pool = _POOL
+        inventory = None
+        if pool is not None:
+            try:
+                inventory = intern_asset_types(
+                    await asyncio.get_running_loop().run_in_executor(pool, normalize, content))
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory) and the executor is unusable from now
+                # on: swap in a fresh pool for later uploads, parse this one in-process.
+                _replace_broken_pool(pool)
+        if inventory is None:
+            inventory = await run_in_threadpool(normalize, content)
+        _PARSE_CACHE[key] = inventory
+        if len(_PARSE_CACHE) > _PARSE_CACHE_MAX:
+            _PARSE_CACHE.popitem(last=False)
+    return inventory
+
+# HYDEX-only rows for the current inventory pair, keyed by object identity.
+# Dropped whenever CURRENT changes; the lock covers the JS-bridge/export threads.
+_MISSING_ROWS: dict = {}
+_MISSING_ROWS_LOCK = threading.Lock()
+
+def missing_stations_rows(left: Inventory, right: Inventory) -> list:
+    """build_missing_stations_rows, memoized for the current (left, right) pair."""
+    key = (id(left), id(right))
+    with _MISSING_ROWS_LOCK:
+        rows = _MISSING_ROWS.get(key)
+        if rows is None:
+            rows = build_missing_stations_rows(left, right)
+            _MISSING_ROWS.clear()
+            _MISSING_ROWS[key] = rows
+    return rows
+
+def _clear_missing_rows():
+    with _MISSING_ROWS_LOCK:
+        _MISSING_ROWS.clear()
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (bytes out, no str→bytes encode pass)."""
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+class _GZipExceptDownloads:
+    """GZipMiddleware for everything but /api/export/ (xlsx is already a zip archive)."""
+    SKIP_PREFIX = "/api/export/"
+
+    def __init__(self, app, **gzip_options):
+        self.app = app
+        self.gzip = GZipMiddleware(app, **gzip_options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.SKIP_PREFIX):
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
 app = FastAPI(
+    default_response_class=ORJSONResponse,
     title="NHS Asset Inventory Manager",
     version="1.1.0",
     description="Upload two Excel files, normalize → JSON, visualize, and compare (session-based)."
@@ -33,15 +133,33 @@ app.add_middleware(
     allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"],
 )
 
+# Station trees and row lists are large, repetitive JSON; level 1 is nearly free on CPU.
+app.add_middleware(_GZipExceptDownloads, minimum_size=1024, compresslevel=1)
+
 app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
 
 @app.on_event("startup")
 def _startup():
+    global _POOL
+    _POOL = _new_pool()
     ensure_dirs(JSON_DIR)
     # wipe old JSON so a fresh app run has no stale compare state
     clear_json_files(JSON_DIR)
     CURRENT["asset_inventory"] = None
     CURRENT["hydex"] = None
+    _clear_missing_rows()
+
+@app.on_event("startup")
+async def _size_threadpool():
+    # The limiter is per event loop, so it must be set from inside the running loop
+    to_thread.current_default_thread_limiter().total_tokens = _THREADPOOL_SIZE
+
+@app.on_event("shutdown")
+def _shutdown():
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
 
 @app.get("/", response_class=HTMLResponse)
 def root():
@@ -51,31 +169,34 @@ def root():
     return index.read_text(encoding="utf-8")
 
 @app.post("/api/upload/asset_inventory")
-async def upload_asset_inventory(file: UploadFile = File(...)):
+async def upload_asset_inventory(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
     Station-centric Excel: we read the file IN-MEMORY (no disk upload),
-    normalize, overwrite JSON, and update session state.
+    normalize, update session state, and overwrite JSON after responding.
     """
     try:
         content = await file.read()  # bytes; not persisted
-        inventory: Inventory = normalize_station_centric(content)
-        save_json(inventory, JSON_DIR, filename="asset_inventory.json")  # overwrite
+        inventory: Inventory = await _normalize_cached("asset_inventory", content, normalize_station_centric)
+        # JSON snapshot is for inspection only; write it after the response is sent
+        background_tasks.add_task(save_json, inventory, JSON_DIR, filename="asset_inventory.json")
         CURRENT["asset_inventory"] = inventory
+        _clear_missing_rows()
         return {"message": "Uploaded & normalized successfully.",
                 "inventory": inventory.model_dump()}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to process asset inventory: {e}")
 
 @app.post("/api/upload/hydex")
-async def upload_hydex(file: UploadFile = File(...)):
+async def upload_hydex(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
-    HYDEX-like Excel: in-memory only; normalized & JSON overwritten.
+    HYDEX-like Excel: in-memory only; normalized & JSON overwritten (in the background).
     """
     try:
         content = await file.read()
-        inventory: Inventory = normalize_asset_centric(content)
-        save_json(inventory, JSON_DIR, filename="hydex.json")  # overwrite
+        inventory: Inventory = await _normalize_cached("hydex", content, normalize_asset_centric)
+        background_tasks.add_task(save_json, inventory, JSON_DIR, filename="hydex.json")
         CURRENT["hydex"] = inventory
+        _clear_missing_rows()
         return {"message": "Uploaded & normalized successfully.",
                 "inventory": inventory.model_dump()}
     except Exception as e:
@@ -87,7 +208,7 @@ def get_json(name: str):
     path = JSON_DIR / f"{name}.json"
     if not path.exists():
         raise HTTPException(status_code=404, detail=f"{name}.json not found.")
-    return JSONResponse(read_json(path))
+    return ORJSONResponse(read_json(path))
 
 @app.get("/api/compare")
 def compare():
@@ -114,22 +235,33 @@ def missing_stations():
     right = CURRENT.get("hydex")
     if not left or not right:
         raise HTTPException(status_code=400, detail="Upload both Excel files in this session before generating the list.")
-    rows = build_missing_stations_rows(left, right)
+    rows = missing_stations_rows(left, right)
     return {"rows": rows, "count": len(rows)}
 
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+_STREAM_THRESHOLD = 1 << 20  # below this, one plain Response beats chunked streaming
+_CHUNK_SIZE = 64 * 1024
+
+async def _aiter_chunks(buf: BytesIO, size: int = _CHUNK_SIZE):
+    """Yield the buffer in fixed-size chunks so the loop can interleave other work."""
+    buf.seek(0)
+    while chunk := buf.read(size):
+        yield chunk
+
 @app.get("/api/export/missing_stations.xlsx")
 def export_missing_stations():
     left = CURRENT.get("asset_inventory")
     right = CURRENT.get("hydex")
     if not left or not right:
         raise HTTPException(status_code=400, detail="Upload both Excel files in this session before exporting.")
-    rows = build_missing_stations_rows(left, right)
-    content = rows_to_excel_bytes(rows)
-    return StreamingResponse(
-        content,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": 'attachment; filename="hydex_only_stations.xlsx"'}
-    )
+    rows = missing_stations_rows(left, right)
+    buf = rows_to_excel_bytes(rows)
+    headers = {"Content-Disposition": 'attachment; filename="hydex_only_stations.xlsx"'}
+    if buf.getbuffer().nbytes < _STREAM_THRESHOLD:
+        return Response(content=buf.getvalue(), media_type=XLSX_MEDIA_TYPE, headers=headers)
+    return StreamingResponse(_aiter_chunks(buf), media_type=XLSX_MEDIA_TYPE, headers=headers)
 
 if __name__ == "__main__":
+    # Single worker on purpose: session state (CURRENT) lives in this process.
+    # loop/http default to "auto" → uvloop + httptools when installed (uvicorn[standard]).
     uvicorn.run("backend.app:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,12 +1,31 @@
 import re
+import numpy as np
 import pandas as pd
 from typing import List, Dict
 from .utils import (
     clean_header, find_station_id_column, find_station_name_column,
-    category_to_asset, is_active_status, coerce_date_only
+    category_to_asset, is_active_status, coerce_date_only, map_distinct
 )
 from ..models import Station, Asset
 
+_CATEGORY_HEADER_RE = re.compile(r"\b(type|category)\b")
+
+def _dominant_per_station(sids: pd.Series, values: pd.Series) -> Dict:
+    """
+    Per station: the column's value if it is the only one seen, or a clear mode
+    (>= 2 rows and >= 60% of the station's non-blank values). Conflicts → omitted.
+    """
+    filled = values.notna()
+    counts = values[filled].groupby([sids[filled], values[filled]], sort=False).size()
+    if counts.empty:
+        return {}
+    per_station = counts.groupby(level=0)
+    total = per_station.transform("sum")
+    n_values = per_station.transform("size")
+    top = per_station.transform("max")
+    keep = (counts == top) & ((n_values == 1) | (counts >= np.maximum(2, 0.6 * total)))
+    return {sid: v for sid, v in counts[keep].index}
+
 def parse_asset_centric(df: pd.DataFrame) -> List[Station]:
     """
     Asset-centric (HYDEX-like):
@@ -14,8 +33,9 @@ def parse_asset_centric(df: pd.DataFrame) -> List[Station]:
       - Map categories to canonical assets; ignore non-asset categories (e.g., 'Installation Type').
       - Only count assets whose status is not mothballed/removed/inactive.
     """
-    df = df.copy()
-    df.columns = [clean_header(c) for c in df.columns]
+    # Rename in place (no copy): the normalizer owns the only reference to df, and
+    # nothing below mutates data. Callers passing their own frame get headers cleaned.
+    df.columns = pd.Index([clean_header(c) for c in df.columns])
 
     sid_col = find_station_id_column(df)
     if not sid_col:
@@ -25,7 +45,7 @@ def parse_asset_centric(df: pd.DataFrame) -> List[Station]:
     lower = {c: c.lower() for c in df.columns}
 
     # category column: contains "type" or "category"
-    cat_cols = [c for c in df.columns if re.search(r"\b(type|category)\b", lower[c])]
+    cat_cols = [c for c in df.columns if _CATEGORY_HEADER_RE.search(lower[c])]
     category_col = cat_cols[0] if cat_cols else None
     if not category_col:
         raise ValueError("Could not infer a HYDEX 'category/type' column.")
@@ -43,41 +63,52 @@ def parse_asset_centric(df: pd.DataFrame) -> List[Station]:
     date_col   = next((c for c in df.columns if "date" in lower[c]), None)
     note_col   = next((c for c in df.columns if any(k in lower[c] for k in ["comment", "note", "remark"])), None)
 
-    grouped: Dict[str, Dict] = {}
-
-    for _, row in df.iterrows():
-        sid = str(row[sid_col]).strip()
-        if not sid:
-            continue
-        sname = str(row[sname_col]).strip() if sname_col and pd.notna(row[sname_col]) else None
-
-        cat = row[category_col] if category_col in df.columns else None
-        asset_name = category_to_asset(cat)
-        if not asset_name:
-            # Not a station-level asset (e.g., "Installation Type") → skip for presence
-            continue
-
-        status_val = row[status_col] if status_col in df.columns else None
-        if not is_active_status(status_val):
-            # MOTHBALLED/REMOVED/INACTIVE → do not count as present
-            continue
+    # --- asset presence: whole-column masks, then one groupby per (station, asset) ---
+    sids = df[sid_col].map(lambda v: str(v).strip())
+    # Category/status hold a handful of labels: classify each distinct label once.
+    # Not a station-level asset (e.g., "Installation Type") → None → skip for presence
+    asset_per_row = pd.Series(map_distinct(df[category_col], category_to_asset), index=df.index)
+    mask = (sids != "") & asset_per_row.notna()
+    if status_col:
+        # MOTHBALLED/REMOVED/INACTIVE → do not count as present
+        mask &= map_distinct(df[status_col], is_active_status, bool)
+
+    present = df[mask]
+    keys = [sids[mask], asset_per_row[mask]]
+
+    # Station name: first non-blank name among the station's asset rows. With none,
+    # keep "" if the first asset row had a (whitespace-only) name, else None.
+    first_name: Dict[str, str] = {}
+    if sname_col:
+        raw_names = present[sname_col]
+        names = raw_names.dropna().map(lambda v: str(v).strip())
+        names = names[names != ""]
+        first_name = names.groupby(sids[names.index], sort=False).first().to_dict()
+        first_row_named = raw_names.notna().groupby(keys[0], sort=False).first()
+        for sid, named in first_row_named.items():
+            if named and sid not in first_name:
+                first_name[sid] = ""
+
+    # Asset attributes: later rows override earlier ones, blanks never do → groupby().last()
+    attr_fields = {"value": value_col, "status": status_col, "date": date_col, "note": note_col}
+    attr_fields = {k: c for k, c in attr_fields.items() if c and c in df.columns}
+    by_asset = present.groupby(keys, sort=False)
+    if attr_fields:
+        last = by_asset[list(dict.fromkeys(attr_fields.values()))].last()
+        records = zip(last.index, last.to_dict(orient="records"))
+    else:
+        records = ((k, {}) for k in by_asset.size().index)
 
+    grouped: Dict[str, Dict] = {}
+    for (sid, asset_name), row in records:
         attrs = {}
-        if value_col in df.columns and pd.notna(row[value_col]):
-            attrs["value"] = row[value_col]
-        if status_col and status_col in df.columns and pd.notna(row[status_col]):
-            attrs["status"] = row[status_col]
-        if date_col and date_col in df.columns and pd.notna(row[date_col]):
-            attrs["date"] = coerce_date_only(row[date_col])
-        if note_col and note_col in df.columns and pd.notna(row[note_col]):
-            attrs["note"] = row[note_col]
-
+        for field, col in attr_fields.items():
+            v = row[col]
+            if pd.notna(v):
+                attrs[field] = coerce_date_only(v) if field == "date" else v
         if sid not in grouped:
-            grouped[sid] = {"station_name": sname, "attributes": {}, "assets": {}}
-        if sname and not grouped[sid]["station_name"]:
-            grouped[sid]["station_name"] = sname
-
-        grouped[sid]["assets"].setdefault(asset_name, {}).update(attrs)
+            grouped[sid] = {"station_name": first_name.get(sid), "attributes": {}, "assets": {}}
+        grouped[sid]["assets"][asset_name] = attrs
 
     def is_lat_col(name: str) -> bool:
         n = name.lower()
@@ -90,49 +121,43 @@ def parse_asset_centric(df: pd.DataFrame) -> List[Station]:
     known_cols = {sid_col, sname_col, category_col, value_col, status_col, date_col, note_col}
     station_attr_candidates = [c for c in df.columns if c not in known_cols]
 
-    for sid, gdf in df.groupby(sid_col):
+    # --- station attributes: one groupby reduction per column, not per (station, column) ---
+    # Keyed by the same stripped-string ids as the asset pass, so a station gets one node
+    # even when the id column is numeric or padded (blank ids are skipped, as above).
+    in_station = df[sid_col].notna() & (sids != "")
+    station_rows = df[in_station]
+    station_sids = sids[in_station]
+    per_col: Dict[str, Dict] = {}
+    for col in station_attr_candidates:
+        if is_lat_col(col) or is_lon_col(col):
+            # Latitude / Longitude: average, rounded
+            means = pd.to_numeric(station_rows[col], errors="coerce").groupby(station_sids).mean().dropna()
+            per_col[col] = {sid: round(float(m), 6) for sid, m in means.items()}
+            continue
+        winners = _dominant_per_station(station_sids, station_rows[col])
+        if "date" in col.lower():
+            # If it's a date-ish column, coerce to date-only
+            winners = {sid: coerce_date_only(v) for sid, v in winners.items()}
+        per_col[col] = winners
+
+    if sname_col:
+        first_seen_name = station_rows[sname_col].groupby(station_sids).first()
+    for sid in sorted(set(station_sids)):  # sorted, like iterating the groupby
         if sid not in grouped:
             # If we saw no assets for this station, still create a node so attributes show up
             sname = None
-            if sname_col and sname_col in gdf.columns:
-                svals = gdf[sname_col].dropna()
-                sname = None if svals.empty else str(svals.iloc[0]).strip() or None
+            if sname_col:
+                v = first_seen_name.get(sid)
+                sname = None if pd.isna(v) else str(v).strip() or None
             grouped[sid] = {"station_name": sname, "attributes": {}, "assets": {}}
+        grouped[sid]["attributes"] = {col: per_col[col][sid] for col in station_attr_candidates
+                                      if sid in per_col[col]}
 
-        attrs: Dict[str, object] = {}
-        for col in station_attr_candidates:
-            series = gdf[col].dropna()
-            if series.empty:
-                continue
-
-            # Latitude / Longitude: average, rounded
-            if is_lat_col(col) or is_lon_col(col):
-                nums = pd.to_numeric(series, errors="coerce").dropna()
-                if not nums.empty:
-                    attrs[col] = round(float(nums.mean()), 6)
-                continue
-
-            uniques = series.unique()
-            if len(uniques) == 1:
-                v = uniques[0]
-                # If it's a date-ish column, coerce to date-only
-                attrs[col] = coerce_date_only(v) if "date" in col.lower() else v
-                continue
-
-            # Otherwise use a clear mode if it dominates
-            vc = series.value_counts(dropna=True)
-            if not vc.empty and vc.iloc[0] >= max(2, 0.6 * vc.sum()):
-                v = vc.index[0]
-                attrs[col] = coerce_date_only(v) if "date" in col.lower() else v
-                continue
-            # else: conflicting values across rows → skip
-
-        grouped[sid]["attributes"] = attrs
-
+    # Values are already normalized above; model_construct skips re-validation
     stations: List[Station] = []
     for sid, payload in grouped.items():
-        assets = [Asset(type=k, attributes=v) for k, v in payload["assets"].items()]
-        stations.append(Station(
+        assets = [Asset.model_construct(type=k, attributes=v) for k, v in payload["assets"].items()]
+        stations.append(Station.model_construct(
             station_id=sid,
             station_name=payload["station_name"],
             attributes=payload["attributes"],
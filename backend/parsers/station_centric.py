@@ -1,11 +1,24 @@
+import numpy as np
 import pandas as pd
 from typing import List
 from .utils import (
     clean_header, find_station_id_column, find_station_name_column,
-    is_boolish_series, header_to_asset, should_exclude_station_attr, coerce_date_only
+    is_boolish_series, header_to_asset, should_exclude_station_attr, coerce_date_only,
+    map_distinct
 )
 from ..models import Station, Asset
 
+_FLAG_TRUE = {"true", "yes", "y", "x", "1", "present"}
+
+def _is_truthy_flag(val) -> bool:
+    v = str(val).strip().lower()
+    if v in _FLAG_TRUE:
+        return True
+    try:
+        return float(v) != 0.0
+    except:
+        return False
+
 def parse_station_centric(df: pd.DataFrame) -> List[Station]:
     """
     Per-row station sheet:
@@ -14,8 +27,9 @@ def parse_station_centric(df: pd.DataFrame) -> List[Station]:
         are treated as asset presence flags.
       - Everything else becomes station attributes.
     """
-    df = df.copy()
-    df.columns = [clean_header(c) for c in df.columns]
+    # Rename in place (no copy): the normalizer owns the only reference to df, and
+    # nothing below mutates data. Callers passing their own frame get headers cleaned.
+    df.columns = pd.Index([clean_header(c) for c in df.columns])
 
     sid_col = find_station_id_column(df)
     if not sid_col:
@@ -31,40 +45,37 @@ def parse_station_centric(df: pd.DataFrame) -> List[Station]:
         if canon and is_boolish_series(df[c]):
             asset_cols.append((c, canon))
 
+    # Asset flags: evaluate each distinct cell value once, then broadcast via codes
+    flags = np.column_stack([map_distinct(df[c], _is_truthy_flag, bool) for c, _ in asset_cols]) if asset_cols \
+        else np.zeros((len(df), 0), dtype=bool)
+
+    # Attributes = everything else (excluding sid/name, asset flags, and noisy time cols)
+    asset_col_names = {ac for ac, _ in asset_cols}
+    attr_cols = [c for c in df.columns
+                 if c != sid_col and c not in asset_col_names and not should_exclude_station_attr(c)]
+    attr_present = df[attr_cols].notna().to_numpy()
+    # Coerce any datetime-like values to date-only, column by column
+    attr_values = pd.DataFrame(
+        {c: df[c].map(coerce_date_only, na_action="ignore") for c in attr_cols},
+        index=df.index,
+    ).to_numpy(dtype=object)
+
+    sids = df[sid_col].map(lambda v: str(v).strip())
+    snames = df[sname_col].map(lambda v: str(v).strip(), na_action="ignore") if sname_col else None
+
     stations: List[Station] = []
-    for _, row in df.iterrows():
-        sid = str(row[sid_col]).strip()
+    for i, sid in enumerate(sids):
         if not sid:
             continue
-        sname = str(row[sname_col]).strip() if sname_col and pd.notna(row[sname_col]) else None
+        sname = snames.iat[i] if snames is not None and pd.notna(snames.iat[i]) else None
 
-        # Assets from boolean flags
-        assets = []
-        for col_name, canon in asset_cols:
-            v = str(row[col_name]).strip().lower()
-            truthy = v in {"true", "yes", "y", "x", "1", "present"}
-            if not truthy:
-                try:
-                    truthy = float(v) != 0.0
-                except:
-                    truthy = False
-            if truthy:
-                assets.append(Asset(type=canon, attributes={}))
+        # Assets from boolean flags (values already normalized → model_construct skips validation)
+        assets = [Asset.model_construct(type=canon, attributes={})
+                  for (_, canon), flag in zip(asset_cols, flags[i]) if flag]
 
-        # Attributes = everything else (excluding sid/name, asset flags, and noisy time cols)
-        attrs = {}
-        for c in df.columns:
-            if c == sid_col or any(c == ac for ac, _ in asset_cols):
-                continue
-            if should_exclude_station_attr(c):
-                continue
-            val = row[c]
-            if pd.isna(val):
-                continue
-            # Coerce any datetime-like values to date-only
-            attrs[c] = coerce_date_only(val)
+        attrs = {c: v for c, v, ok in zip(attr_cols, attr_values[i], attr_present[i]) if ok}
 
-        stations.append(Station(
+        stations.append(Station.model_construct(
             station_id=sid,
             station_name=sname,
             attributes=attrs,
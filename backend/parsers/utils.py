@@ -1,6 +1,9 @@
 import re
+import sys
+from functools import lru_cache
+import numpy as np
 import pandas as pd
-from typing import Optional, List
+from typing import Optional, List, Callable
 from datetime import datetime, date
 
 # --- existing helpers kept ---
@@ -11,14 +14,42 @@ ASSET_KEYWORDS = [
 ]
 TRUTHY_STRINGS = {"yes", "true", "y", "x", "1", "present", "checked"}
 
+_WS_RE = re.compile(r"\s+")
+_STATION_ID_RE = re.compile(r"^[A-Za-z0-9\-_/]+$")
+_DIGIT_RE = re.compile(r"\d")
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
 def clean_header(h: str) -> str:
-    return re.sub(r"\s+", " ", str(h or "")).strip()
+    return _WS_RE.sub(" ", str(h or "")).strip()
 
 def normalize_asset_type(val: str) -> str:
     s = str(val or "").strip().lower()
     s = s.replace("stillwell", "still well").replace("stilling well", "still well")
     return s.title()
 
+def map_distinct(series: pd.Series, fn: Callable, dtype=object) -> np.ndarray:
+    """
+    Apply fn once per distinct value and broadcast back to rows. factorize folds
+    None/NaN/pd.NA/NaT into one code, so missing cells are evaluated once per NA type
+    instead (e.g. str(None) and str(nan) differ).
+    """
+    codes, uniques = pd.factorize(series)
+    lookup = np.array([fn(u) for u in uniques], dtype=dtype)
+    out = np.empty(len(codes), dtype=dtype)
+    filled = codes >= 0
+    out[filled] = lookup[codes[filled]]
+    missing = np.flatnonzero(~filled)
+    if missing.size:
+        values = series.to_numpy()
+        by_type = {}
+        for i in missing:
+            v = values[i]
+            t = type(v)
+            if t not in by_type:
+                by_type[t] = fn(v)
+            out[i] = by_type[t]
+    return out
+
 def is_boolish_series(s: pd.Series) -> bool:
     sample = s.dropna().astype(str).str.strip().str.lower().unique()
     if len(sample) == 0:
@@ -39,7 +70,7 @@ def is_station_id_like(series: pd.Series) -> bool:
     s = series.dropna().astype(str).str.strip()
     if s.empty:
         return False
-    alnum_ratio = (s.str.match(r"^[A-Za-z0-9\-_/]+$")).mean()
+    alnum_ratio = (s.str.match(_STATION_ID_RE)).mean()
     if alnum_ratio < 0.9:
         return False
     unique_ratio = s.nunique() / max(len(s), 1)
@@ -112,31 +143,48 @@ EXCLUDE_IN_HEADER = (
 
 NEGATIVE_STATUSES = {"mothballed", "removed", "inactive", "decommissioned"}
 
+# Compiled once at import. ASSET_PATTERNS are fused into one regex: each alternative
+# is a lookahead anchored at the start, so the first *listed* pattern that occurs
+# anywhere in the header wins (same priority as trying them in order).
+_ASSET_RE = re.compile(
+    "|".join(f"(?=.*?(?P<g{i}>{pat}))" for i, (pat, _) in enumerate(ASSET_PATTERNS)),
+    re.DOTALL,
+)
+# Canonical names are interned so both parsers hand out the same str objects;
+# the comparator's set operations then hit the identity fast path.
+_ASSET_CANON = [sys.intern(canon) for _, canon in ASSET_PATTERNS]
+_EXCLUDE_RE = re.compile("|".join(re.escape(tok) for tok in EXCLUDE_IN_HEADER))
+
+@lru_cache(maxsize=4096)
 def header_to_asset(header: str) -> Optional[str]:
     s = clean_header(header).lower()
-    if any(tok in s for tok in EXCLUDE_IN_HEADER):
+    if _EXCLUDE_RE.search(s):
         return None
-    for pat, canon in ASSET_PATTERNS:
-        if re.search(pat, s):
-            return canon
-    return None
+    m = _ASSET_RE.match(s)
+    if not m:
+        return None
+    return _ASSET_CANON[int(m.lastgroup[1:])]
 
+@lru_cache(maxsize=4096)
 def is_active_status(val) -> bool:
     s = str(val or "").strip().lower()
     if s == "":
         return True  # blank/unknown → treat as present
     return s not in NEGATIVE_STATUSES
 
+@lru_cache(maxsize=4096)
 def category_to_asset(category: str) -> Optional[str]:
     """Map HYDEX category labels to canonical station-level assets."""
     s = str(category or "").strip().lower()
-    if "shelter type" in s: return "Shelter"
-    if "well type" in s:    return "Well"
-    if "cableway" in s:     return "Cableway"
-    if "weir" in s:         return "Weir"
-    if "metering bridge" in s or "bridge" in s: return "Metering Bridge"
-    # 'Installation Type' etc. are not assets for presence comparison
-    return None
+    if "shelter type" in s:  canon = "Shelter"
+    elif "well type" in s:   canon = "Well"
+    elif "cableway" in s:    canon = "Cableway"
+    elif "weir" in s:        canon = "Weir"
+    elif "metering bridge" in s or "bridge" in s: canon = "Metering Bridge"
+    else:
+        # 'Installation Type' etc. are not assets for presence comparison
+        return None
+    return sys.intern(canon)
 
 # ---- asset-inventory attribute filtering & date coercion ----
 _EXCLUDE_ATTR_TIME_TOKENS = ("start time", "completion time")
@@ -157,11 +205,25 @@ def coerce_date_only(val):
         return val.date().isoformat()
     if isinstance(val, date):
         return val.isoformat()
-    s = str(val).strip()
+    coerced = _coerce_date_str(str(val).strip())
+    return val if coerced is None else coerced
+
+@lru_cache(maxsize=4096)
+def _coerce_date_str(s: str) -> Optional[str]:
+    """Cached string branch of coerce_date_only; None means 'not a date'."""
     # Quick exit if no digits
-    if not re.search(r"\d", s):
-        return val
+    if not _DIGIT_RE.search(s):
+        return None
+    # Fast path for ISO strings (the common case); anything unusual goes to pandas
+    if _ISO_DATE_RE.match(s):
+        try:
+            dt = datetime.fromisoformat(s)
+        except ValueError:
+            pass
+        else:
+            if pd.Timestamp.min.year < dt.year < pd.Timestamp.max.year:
+                return dt.date().isoformat()
     dt = pd.to_datetime(s, errors="coerce")
     if pd.notna(dt):
         return dt.date().isoformat()
-    return val
+    return None
@@ -1,3 +1,4 @@
+import sys
 from pathlib import Path
 from io import BytesIO
 import pandas as pd
@@ -6,16 +7,43 @@ from ..parsers.station_centric import parse_station_centric
 from ..parsers.asset_centric import parse_asset_centric
 from typing import Union
 
+try:
+    import python_calamine  # noqa: F401  (Rust-based reader; much faster than openpyxl)
+    _HAS_CALAMINE = True
+except ImportError:
+    _HAS_CALAMINE = False
+
 ExcelSrc = Union[Path, str, bytes, BytesIO]
 
+# Fallback: stream rows instead of building the full workbook DOM.
+# Cached formula values only, and skip external-link parts entirely.
+_OPENPYXL_KWARGS = {"read_only": True, "data_only": True, "keep_links": False}
+
+def _read_with_engine(src) -> pd.DataFrame:
+    """Prefer calamine; fall back to a read-only openpyxl workbook."""
+    if _HAS_CALAMINE:
+        return pd.read_excel(src, engine="calamine")
+    return pd.read_excel(src, engine="openpyxl", engine_kwargs=_OPENPYXL_KWARGS)
+
 def _read_excel(src: ExcelSrc) -> pd.DataFrame:
     """Accept a path/str/bytes/BytesIO and return a DataFrame."""
     if isinstance(src, bytes):
-        return pd.read_excel(BytesIO(src))
+        return _read_with_engine(BytesIO(src))
     if isinstance(src, BytesIO):
         src.seek(0)
-        return pd.read_excel(src)
-    return pd.read_excel(src)  # path-like
+        return _read_with_engine(src)
+    return _read_with_engine(src)  # path-like
+
+def intern_asset_types(inventory: Inventory) -> Inventory:
+    """Re-intern Asset.type after a pool round-trip (unpickled strs are fresh copies), so
+    both compared inventories share one str per type like in-process parses do."""
+    for station in inventory.stations:
+        for asset in station.assets:
+            asset.type = sys.intern(asset.type)
+    return inventory
+
+def warm_worker() -> None:
+    """No-op pool task: unpickling it imports this module (pandas, parsers) in the worker."""
 
 def normalize_station_centric(src: ExcelSrc) -> Inventory:
     df = _read_excel(src)
@@ -5,58 +5,67 @@ import re
 import pandas as pd
 
 from ..models import Inventory, Station
+from .comparator import norm_id
 
-# Heuristic extractors for HYDEX station attributes
-def _get_attr(attrs: Dict[str, Any], keys_like: List[str]) -> str | None:
-    if not attrs:
-        return None
+try:
+    import xlsxwriter  # noqa: F401  (much faster writer than openpyxl)
+    _HAS_XLSXWRITER = True
+except ImportError:
+    _HAS_XLSXWRITER = False
+
+# Heuristic extractors for HYDEX station attributes: field -> header substrings.
+# Each field takes the first attribute (in sheet order) whose header contains any of them.
+_FIELD_KEYS = {
+    "first": ("first name", "firstname", "given name"),
+    "last": ("last name", "lastname", "surname", "family name"),
+    "tech": ("technician", "tech name", "tech", "contact name", "name"),
+    "province": ("province", "prov"),
+    "office": ("office",),
+}
+
+def _station_fields(attrs: Dict[str, Any]) -> Dict[str, str]:
+    """One pass over a station's attributes, lowercasing each header once."""
+    found: Dict[str, str] = {}
     for k, v in attrs.items():
         k_low = str(k).lower()
-        if any(key in k_low for key in keys_like):
-            return str(v)
-    return None
+        for field, keys in _FIELD_KEYS.items():
+            if field not in found and any(key in k_low for key in keys):
+                found[field] = str(v)
+        if len(found) == len(_FIELD_KEYS):
+            break
+    return found
 
-def _tech_name(attrs: Dict[str, Any]) -> str | None:
-    if not attrs:
-        return None
+def _tech_name(found: Dict[str, str]) -> str | None:
     # Prefer explicit first/last name columns
-    first = _get_attr(attrs, ["first name", "firstname", "given name"])
-    last = _get_attr(attrs, ["last name", "lastname", "surname", "family name"])
+    first, last = found.get("first"), found.get("last")
     if first or last:
         return " ".join(x for x in [first, last] if x)
     # Otherwise look for generic technician/name fields
-    cand = _get_attr(attrs, ["technician", "tech name", "tech", "contact name", "name"])
-    return cand
-
-def _province(attrs: Dict[str, Any]) -> str | None:
-    return _get_attr(attrs, ["province", "prov"])
-
-def _office(attrs: Dict[str, Any]) -> str | None:
-    return _get_attr(attrs, ["office"])
+    return found.get("tech")
 
 def build_missing_stations_rows(asset_inventory: Inventory, hydex: Inventory) -> List[Dict[str, str]]:
-    def norm_id(x: str) -> str:
-        # Trim whitespace and compare in UPPERCASE
-        return str(x or "").strip().upper()
-
+    # Same station-id normalization as the comparator (trimmed, UPPERCASE)
     left_ids = {norm_id(s.station_id) for s in asset_inventory.stations}
 
-    rows: List[Dict[str, str]] = []
+    keyed: List[tuple] = []
     for s in hydex.stations:
-        if norm_id(s.station_id) not in left_ids:
-            attrs = s.attributes or {}
-            rows.append({
-                "station_id": s.station_id,
-                "station_name": s.station_name or "",
-                "province": _province(attrs) or "",
-                "office": _office(attrs) or "",
-                "tech_name": _tech_name(attrs) or "",
-            })
-    # Sort by Station ID for consistency
-    rows.sort(key=lambda r: norm_id(r["station_id"]))
-    return rows
+        nid = norm_id(s.station_id)
+        if nid in left_ids:
+            continue
+        found = _station_fields(s.attributes) if s.attributes else {}
+        keyed.append((nid, {
+            "station_id": s.station_id,
+            "station_name": s.station_name or "",
+            "province": found.get("province") or "",
+            "office": found.get("office") or "",
+            "tech_name": _tech_name(found) or "",
+        }))
+    # Sort by Station ID for consistency (stable, like the previous list.sort)
+    keyed.sort(key=lambda kr: kr[0])
+    return [row for _, row in keyed]
 
-def rows_to_excel_bytes(rows: List[Dict[str, str]]) -> BytesIO:
+def write_rows_excel(rows: List[Dict[str, str]], target) -> None:
+    """Write the HYDEX-only table as .xlsx to a path or binary file-like object."""
     df = pd.DataFrame(rows, columns=["station_id", "station_name", "province", "office", "tech_name"])
     df.rename(columns={
         "station_id":"Station ID",
@@ -65,8 +74,17 @@ def rows_to_excel_bytes(rows: List[Dict[str, str]]) -> BytesIO:
         "office":"Office",
         "tech_name":"Tech Name",
     }, inplace=True)
-    buf = BytesIO()
-    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+    if _HAS_XLSXWRITER:
+        # No constant_memory: to_excel writes column by column, and that mode drops
+        # every cell written after its row has been flushed.
+        writer = pd.ExcelWriter(target, engine="xlsxwriter")
+    else:
+        writer = pd.ExcelWriter(target, engine="openpyxl")
+    with writer:
         df.to_excel(writer, index=False, sheet_name="HYDEX-only Stations")
+
+def rows_to_excel_bytes(rows: List[Dict[str, str]]) -> BytesIO:
+    buf = BytesIO()
+    write_rows_excel(rows, buf)
     buf.seek(0)
     return buf
@@ -2,8 +2,8 @@ from pathlib import Path
 from datetime import datetime, date
 import json
 
+import orjson
 import pandas as pd
-import numpy as np
 
 def ensure_dirs(*dirs: Path) -> None:
     for d in dirs:
@@ -18,21 +18,23 @@ def _json_default(o):
             return str(o)
     if isinstance(o, date):
         return o.isoformat()
-    if isinstance(o, (np.integer,)):
-        return int(o)
-    if isinstance(o, (np.floating,)):
-        return float(o)
-    if isinstance(o, (np.bool_)):
-        return bool(o)
     return str(o)
 
+# numpy scalars are native to orjson; datetimes are passed through to _json_default
+# so they keep the date-only format.
+_ORJSON_OPTS = (
+    orjson.OPT_INDENT_2
+    | orjson.OPT_SERIALIZE_NUMPY
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_NON_STR_KEYS
+)
+
 def save_json(data_obj, dest_dir: Path, filename: str) -> Path:
     """Overwrite JSON on every call."""
     dest_dir.mkdir(parents=True, exist_ok=True)
     out = dest_dir / filename
     payload = data_obj.model_dump() if hasattr(data_obj, "model_dump") else data_obj
-    with out.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2, default=_json_default, allow_nan=False)
+    out.write_bytes(orjson.dumps(payload, default=_json_default, option=_ORJSON_OPTS))
     return out
 
 def read_json(path: Path):
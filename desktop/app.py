@@ -1,82 +1,236 @@
 # desktop/app.py
-# Launch FastAPI in a background thread and open a native window with pywebview.
+# Serve FastAPI from pywebview's start() worker and open a native window on it.
 
+import asyncio
+import importlib.util
+import multiprocessing
+import os
+import socket
 import sys
-import threading
-import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict
 
 import uvicorn
 import webview
 
-# Ensure the project root (which contains 'backend/') is on sys.path
+try:
+    import uvloop  # part of uvicorn[standard]; has no Windows build
+except ImportError:
+    uvloop = None
+
+# `pip install -e .` makes 'backend' importable. Otherwise (or if some unrelated
+# top-level 'backend' package would be picked up) put the project root first.
 ROOT = Path(__file__).resolve().parents[1]
-if str(ROOT) not in sys.path:
+_backend_spec = importlib.util.find_spec("backend")
+if _backend_spec is None or not any(
+    Path(p).resolve() == ROOT / "backend" for p in (_backend_spec.submodule_search_locations or ())
+):
     sys.path.insert(0, str(ROOT))
 
 # Import the FastAPI app object directly (avoid string import)
 from backend.app import app as fastapi_app  # noqa: E402
+# Same module objects the server uses: CURRENT is shared by reference
+from backend.app import CURRENT, missing_stations_rows  # noqa: E402
+from backend.services.comparator import compare_inventories  # noqa: E402
+from backend.services.report import rows_to_excel_bytes, write_rows_excel  # noqa: E402
+
+
+HOST = "127.0.0.1"
+PORT = 8000
+# NHS_DESKTOP_DEBUG=1 (or true/yes) brings back uvicorn's info-level logs; 0/unset keeps warnings only.
+DEBUG = os.environ.get("NHS_DESKTOP_DEBUG", "").strip().lower() in {"1", "true", "yes"}
+# Large buffer so the zip writer's many small writes reach the OS as a few big ones
+_WRITE_BUFFER = 4 * 1024 * 1024
+
+# Single worker: keeps Excel builds off the JS-bridge thread and serializes repeat clicks.
+_export_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xlsx-export")
+# In-flight/finished exports by job id; export_status drops an entry once it reports it.
+_jobs: Dict[str, Future] = {}
+# The app's single window, set by create_window in __main__
+_window = None
+
+
+def _build_and_write(left, right, path):
+    """Build the HYDEX-only rows and write the workbook to `path` (runs on the export pool)."""
+    rows = missing_stations_rows(left, right)
+    if not rows:
+        return {"ok": False, "error": "No HYDEX-only stations to export."}
+    # Write the workbook straight to disk (no in-memory copy) under a temp name,
+    # then rename over the target so a failed write never leaves a broken xlsx.
+    tmp = f"{path}.part"
+    try:
+        with open(tmp, "wb", buffering=_WRITE_BUFFER) as f:
+            if hasattr(os, "posix_fadvise"):  # not on Windows/macOS
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            write_rows_excel(rows, f)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return {"ok": True, "path": str(path)}
+
+
+def _prewarm_export():
+    """Build a throwaway empty workbook so the first real export skips the writer's lazy imports."""
+    rows_to_excel_bytes([])
 
 
 class Api:
     """
     JS-bridged API available at window.pywebview.api in the frontend.
-    Provides a native 'Save As...' for the HYDEX-only stations export.
+    Provides a native 'Save As...' + background job for the HYDEX-only export, plus
+    in-process versions of the read-only endpoints (no HTTP round-trip).
     """
-    def save_missing_stations_excel(self):
+    def compare(self):
+        """Same payload as GET /api/compare, wrapped as {"ok": True, ...}."""
+        left = CURRENT.get("asset_inventory")
+        right = CURRENT.get("hydex")
+        if not left or not right:
+            return {"ok": False, "error": "Upload both Excel files in this session before comparing."}
         try:
-            # Pull current, in-memory inventories from the backend app
-            from backend.app import CURRENT
-            from backend.services.report import (
-                build_missing_stations_rows,
-                rows_to_excel_bytes,
-            )
-            left = CURRENT.get("asset_inventory")
-            right = CURRENT.get("hydex")
-            if not left or not right:
-                return {"ok": False, "error": "Upload both Excel files in this session before exporting."}
-
-            rows = build_missing_stations_rows(left, right)
-            if not rows:
-                return {"ok": False, "error": "No HYDEX-only stations to export."}
+            return {"ok": True, **compare_inventories(left, right)}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
 
-            buf = rows_to_excel_bytes(rows)  # BytesIO
+    def get_missing_stations_rows(self):
+        """Same payload as GET /api/missing_stations, wrapped as {"ok": True, ...}."""
+        left = CURRENT.get("asset_inventory")
+        right = CURRENT.get("hydex")
+        if not left or not right:
+            return {"ok": False, "error": "Upload both Excel files in this session before generating the list."}
+        try:
+            rows = missing_stations_rows(left, right)
+            return {"ok": True, "rows": rows, "count": len(rows)}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
 
-            # Open native Save As dialog
-            win = webview.windows[0]
+    # Export is split so no bridge call blocks on the write: pick_save_path → start_export
+    # (returns a job id at once) → poll export_status until it reports done.
+    def pick_save_path(self):
+        left = CURRENT.get("asset_inventory")
+        right = CURRENT.get("hydex")
+        if not left or not right:
+            return {"ok": False, "error": "Upload both Excel files in this session before exporting."}
+        try:
+            # Dialog first so cancelling costs nothing; an empty HYDEX-only list is
+            # reported by _build_and_write through export_status
             # NOTE: create_file_dialog returns a list/tuple of selected paths or None
-            paths = win.create_file_dialog(
+            paths = _window.create_file_dialog(
                 webview.SAVE_DIALOG,
                 save_filename="hydex_only_stations.xlsx",
             )
-            if not paths:
-                return {"ok": False, "cancelled": True}
-            path = paths[0] if isinstance(paths, (list, tuple)) else paths
-            with open(path, "wb") as f:
-                f.write(buf.getvalue())
-            return {"ok": True, "path": str(path)}
         except Exception as e:
             return {"ok": False, "error": str(e)}
+        if not paths:
+            return {"ok": False, "cancelled": True}
+        path = paths[0] if isinstance(paths, (list, tuple)) else paths
+        return {"ok": True, "path": str(path)}
 
+    def start_export(self, path):
+        left = CURRENT.get("asset_inventory")
+        right = CURRENT.get("hydex")
+        if not left or not right:
+            return {"ok": False, "error": "Upload both Excel files in this session before exporting."}
+        job_id = uuid.uuid4().hex
+        _jobs[job_id] = _export_pool.submit(_build_and_write, left, right, path)
+        return {"ok": True, "job": job_id}
 
-def run_server():
-    # If port 8000 is already in use, stop any previous run first.
-    uvicorn.run(fastapi_app, host="127.0.0.1", port=8000, reload=False, log_level="info")
+    def export_status(self, job_id):
+        fut = _jobs.get(job_id)
+        if fut is None:
+            return {"ok": False, "done": True, "error": "Unknown export job."}
+        if not fut.done():
+            return {"ok": True, "done": False}
+        # Bridge calls run on their own threads: pop so a concurrent poll can't KeyError
+        if _jobs.pop(job_id, None) is None:
+            return {"ok": False, "done": True, "error": "Unknown export job."}
+        try:
+            return {**fut.result(), "done": True}
+        except Exception as e:
+            return {"ok": False, "done": True, "error": str(e)}
 
 
-if __name__ == "__main__":
-    t = threading.Thread(target=run_server, daemon=True)
-    t.start()
+def _bind_socket(host: str, port: int) -> socket.socket:
+    """Bind the loopback listener ourselves; uvicorn serves on the socket as-is."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if sys.platform == "win32":
+        # Windows SO_REUSEADDR would let a second process steal the port; refuse sharing instead
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+    else:
+        # Rebind right away on relaunch even if the previous run left TIME_WAIT connections
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def _bind_listener(host: str, port: int) -> socket.socket:
+    """Bind `port`, or an OS-chosen free port if it is taken (e.g. a previous run is still up)."""
+    try:
+        return _bind_socket(host, port)
+    except OSError:
+        return _bind_socket(host, 0)
+
+
+def make_server() -> uvicorn.Server:
+    # http: httptools' C parser (uvicorn[standard]). The loop is created by _serve, not by
+    # uvicorn, so Config(loop=...) has no effect here: uvloop where it is installed,
+    # asyncio otherwise (Windows). Warnings only and no access log: one local client, and
+    # every line goes through a stderr pipe under pywebview. No Server/Date headers either;
+    # nothing on localhost reads them.
+    config = uvicorn.Config(
+        fastapi_app, reload=False,
+        log_level="info" if DEBUG else "warning",
+        http="httptools", access_log=False,
+        server_header=False, date_header=False,
+    )
+    return uvicorn.Server(config)
 
-    # Give the server a moment to bind the port before opening the window
-    time.sleep(0.8)
 
-    webview.create_window(
+async def _serve_and_load(server: uvicorn.Server, sock: socket.socket, window, url: str):
+    """Serve on `sock`; point the window at the app once uvicorn reports it is accepting connections."""
+    serving = asyncio.ensure_future(server.serve(sockets=[sock]))
+    while not (server.started and window.events.shown.is_set()):
+        if serving.done():
+            window.load_html("<h1>Backend failed to start.</h1>")
+            return await serving
+        await asyncio.sleep(0.01)
+    window.load_url(url)
+    await serving
+
+
+def _serve(server: uvicorn.Server, sock: socket.socket, window, url: str):
+    """Runs on the thread webview.start() spawns for `func`: the app's only event loop."""
+    run = uvloop.run if uvloop is not None else asyncio.run
+    run(_serve_and_load(server, sock, window, url))
+
+
+if __name__ == "__main__":
+    # Parse-pool workers re-run this entry point in a frozen (PyInstaller) build
+    multiprocessing.freeze_support()
+    # The listener is already bound (see _bind_listener), so a busy port 8000 can't fail later.
+    sock = _bind_listener(HOST, PORT)
+    port = sock.getsockname()[1]
+    server = make_server()
+    # Warm the xlsx writer on the export thread while the window is coming up
+    _export_pool.submit(_prewarm_export)
+
+    # Show the window immediately; _serve_and_load swaps in the app once the server is up
+    _window = webview.create_window(
         "NHS Asset Inventory Manager",
-        "http://127.0.0.1:8000",
+        html="<p>Loading…</p>",
         width=1280,
         height=860,
         resizable=True,
         js_api=Api(),
     )
-    webview.start()
+
+    def _on_closed():
+        server.should_exit = True  # graceful uvicorn shutdown (runs the app's shutdown hooks)
+
+    _window.events.closed += _on_closed
+    webview.start(_serve, (server, sock, _window, f"http://{HOST}:{port}"))
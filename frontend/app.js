@@ -267,16 +267,34 @@ window.addEventListener("DOMContentLoaded", () => {
     if (invB) renderInventoryTree(invB, treeB);
   });
 
-  compareBtn.addEventListener("click", async () => {
-    compareStatus.textContent = "Comparing...";
-    const res = await fetch("/api/compare");
+  // Desktop app: call the pywebview bridge directly (no HTTP round-trip).
+  // Browser: hit the equivalent endpoint. Returns the payload, or null after showing the error.
+  async function getSessionData(apiMethod, endpoint) {
+    const api = window.pywebview && window.pywebview.api;
+    if (api && typeof api[apiMethod] === "function") {
+      try {
+        const resp = await api[apiMethod]();
+        if (resp && resp.ok) return resp;
+        compareStatus.textContent = `Error: ${resp && resp.error ? resp.error : "Unknown error"}`;
+      } catch (e) {
+        compareStatus.textContent = `Error: ${e.message || e}`;
+      }
+      return null;
+    }
+    const res = await fetch(endpoint);
     if (!res.ok) {
       const err = await res.json().catch(() => ({}));
       compareStatus.textContent = `Error: ${err.detail || res.statusText}`;
-      return;
+      return null;
     }
+    return res.json();
+  }
+
+  compareBtn.addEventListener("click", async () => {
+    compareStatus.textContent = "Comparing...";
+    const data = await getSessionData("compare", "/api/compare");
+    if (!data) return;
     compareStatus.textContent = "";
-    const data = await res.json();
     renderComparison(data, results);
     results.scrollIntoView({ behavior: "smooth", block: "start" });
     switchTab("resultsPane");
@@ -317,14 +335,9 @@ window.addEventListener("DOMContentLoaded", () => {
 
   missingBtn.addEventListener("click", async () => {
     compareStatus.textContent = "Building HYDEX-only list...";
-    const res = await fetch("/api/missing_stations");
-    if (!res.ok){
-      const err = await res.json().catch(()=>({}));
-      compareStatus.textContent = `Error: ${err.detail || res.statusText}`;
-      return;
-    }
+    const payload = await getSessionData("get_missing_stations_rows", "/api/missing_stations");
+    if (!payload) return;
     compareStatus.textContent = "";
-    const payload = await res.json();
     missingRows = payload.rows || [];
     renderMissingTable(missingRows, missingTable);
     switchTab("missingPane");
@@ -333,13 +346,35 @@ window.addEventListener("DOMContentLoaded", () => {
 
   exportMissingBtn.addEventListener("click", async () => {
     // If running inside the desktop app (pywebview), use native Save As...
-    if (window.pywebview && window.pywebview.api && typeof window.pywebview.api.save_missing_stations_excel === "function") {
+    const api = window.pywebview && window.pywebview.api;
+    if (api && typeof api.pick_save_path === "function") {
       try {
-        const resp = await window.pywebview.api.save_missing_stations_excel();
+        const picked = await api.pick_save_path();
+        if (picked && picked.cancelled) return;  // user cancelled — do nothing
+        if (!picked || !picked.ok) {
+          alert(`Export failed: ${picked && picked.error ? picked.error : "Unknown error"}`);
+          return;
+        }
+        const job = await api.start_export(picked.path);
+        if (!job || !job.ok) {
+          alert(`Export failed: ${job && job.error ? job.error : "Unknown error"}`);
+          return;
+        }
+        // The workbook is written in the background; poll so the UI stays usable
+        exportMissingBtn.disabled = true;
+        compareStatus.textContent = "Exporting...";
+        let resp;
+        try {
+          do {
+            await new Promise(r => setTimeout(r, 200));
+            resp = await api.export_status(job.job);
+          } while (resp && !resp.done);
+        } finally {
+          exportMissingBtn.disabled = false;
+          compareStatus.textContent = "";
+        }
         if (resp && resp.ok) {
           alert(`Saved to:\n${resp.path}`);
-        } else if (resp && resp.cancelled) {
-          // user cancelled — do nothing
         } else {
           alert(`Export failed: ${resp && resp.error ? resp.error : "Unknown error"}`);
         }
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from backend.parsers.asset_centric import parse_asset_centric
+
+
+def _hydex(ids):
+    return pd.DataFrame({
+        "Station ID": ids,
+        "Station Name": ["Alpha", "Alpha", "Beta"],
+        "Asset Type": ["SHELTER TYPE", "WELL TYPE", "SHELTER TYPE"],
+        "Value": ["STEEL", "CONCRETE", "WOOD"],
+        "Status": ["ACTIVE", "ACTIVE", "ACTIVE"],
+        "Latitude": [45.1, 45.3, 46.0],
+        "Province": ["NB", "NB", "NS"],
+    })
+
+
+@pytest.mark.parametrize("ids, expected", [
+    ([101, 101, 102], ["101", "102"]),
+    ([" S1", "S1 ", "S2"], ["S1", "S2"]),
+])
+def test_one_node_per_station_for_numeric_and_padded_ids(ids, expected):
+    stations = parse_asset_centric(_hydex(ids))
+    by_id = {s.station_id: s for s in stations}
+
+    assert [s.station_id for s in stations] == expected
+    first = by_id[expected[0]]
+    assert [a.type for a in first.assets] == ["Shelter", "Well"]
+    assert first.attributes == {"Latitude": 45.2, "Province": "NB"}
+    assert by_id[expected[1]].attributes == {"Latitude": 46.0, "Province": "NS"}
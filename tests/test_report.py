@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+from backend.services import report
+
+
+ROWS = [
+    {"station_id": f"0{i}AB00{i}", "station_name": f"Station {i}", "province": "NB",
+     "office": "Fredericton", "tech_name": "A. Tech" if i % 2 else ""}
+    for i in range(5)
+]
+
+
+@pytest.mark.parametrize("use_xlsxwriter", [True, False])
+def test_excel_export_round_trips_every_cell(monkeypatch, use_xlsxwriter):
+    if use_xlsxwriter:
+        pytest.importorskip("xlsxwriter")
+    monkeypatch.setattr(report, "_HAS_XLSXWRITER", use_xlsxwriter)
+
+    df = pd.read_excel(report.rows_to_excel_bytes(ROWS), dtype=str, keep_default_na=False)
+
+    assert list(df.columns) == ["Station ID", "Station Name", "Province", "Office", "Tech Name"]
+    expected = [[r["station_id"], r["station_name"], r["province"], r["office"], r["tech_name"]]
+                for r in ROWS]
+    assert df.values.tolist() == expected
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from backend.parsers.station_centric import _is_truthy_flag
+from backend.parsers.utils import map_distinct
+
+
+def test_map_distinct_matches_per_cell_for_each_na_kind():
+    s = pd.Series(["yes", None, np.nan, pd.NA, "yes", None, 0, "1"], dtype=object)
+
+    got = map_distinct(s, _is_truthy_flag, bool)
+
+    assert got.tolist() == [_is_truthy_flag(v) for v in s]
+    assert got.tolist() == [True, False, True, False, True, False, False, True]
+
+
+def test_map_distinct_all_missing_and_empty():
+    assert map_distinct(pd.Series([np.nan, np.nan]), str).tolist() == ["nan", "nan"]
+    assert map_distinct(pd.Series([], dtype=object), str, bool).tolist() == []